@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.db import get_async_session
+from app.instrumentation import query_budget
+from app.repositories.base import TournamentRepositoryProtocol
+from app.repositories.memory import MemoryTournamentRepository, memory_store
 from app.repositories.tournament import TournamentRepository
 from app.schemas.tournament import (
     PlayerCreate,
@@ -15,18 +19,38 @@ from app.services.tournament import TournamentService
 router = APIRouter()
 
 
-def get_tournament_service(
+def get_sql_repository(
     session: AsyncSession = Depends(get_async_session),
+) -> TournamentRepositoryProtocol:
+    return TournamentRepository(session)
+
+
+def get_memory_repository() -> TournamentRepositoryProtocol:
+    return MemoryTournamentRepository(memory_store)
+
+
+get_tournament_repository = (
+    get_memory_repository
+    if settings.storage_backend == "memory"
+    else get_sql_repository
+)
+
+
+def get_tournament_service(
+    repository: TournamentRepositoryProtocol = Depends(get_tournament_repository),
 ) -> TournamentService:
-    repository = TournamentRepository(session)
     return TournamentService(repository)
 
 
+# Query budgets are for Postgres with a cold cache, where every write also
+# runs a pg_notify; SQLite in tests skips it. Registration counts the
+# existence query a Bloom filter false positive adds.
 @router.post(
     "/tournaments",
     response_model=TournamentResponse,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(3)
 async def create_tournament(
     tournament_data: TournamentCreate,
     service: TournamentService = Depends(get_tournament_service),
@@ -40,6 +64,7 @@ async def create_tournament(
     response_model=PlayerRegistrationResponse,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(7)
 async def register_player(
     tournament_id: int,
     player_data: PlayerCreate,
@@ -50,6 +75,7 @@ async def register_player(
 
 
 @router.get("/tournaments/{tournament_id}/players", response_model=PlayersListResponse)
+@query_budget(2)
 async def get_tournament_players(
     tournament_id: int,
     service: TournamentService = Depends(get_tournament_service),
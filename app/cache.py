@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.models.tournament import Tournament
+
+
+class TournamentCache:
+    """Per-worker LRU cache of tournaments.
+
+    Entries are only served while ``enabled`` is set, i.e. while the worker's
+    invalidation listener is connected; otherwise every lookup misses and
+    callers fall back to the database. Player counts are deliberately not
+    cached: they enforce ``max_players`` and must come from the database.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.enabled = False
+        self._tournaments: OrderedDict[int, Tuple[str, int, datetime]] = OrderedDict()
+
+    def get_tournament(self, tournament_id: int) -> Optional[Tournament]:
+        if not self.enabled:
+            return None
+        entry = self._tournaments.get(tournament_id)
+        if entry is None:
+            return None
+        self._tournaments.move_to_end(tournament_id)
+        name, max_players, start_at = entry
+        # Hand out a fresh transient instance so no session ever shares it.
+        return Tournament(
+            id=tournament_id, name=name, max_players=max_players, start_at=start_at
+        )
+
+    def put_tournament(self, tournament: Tournament) -> None:
+        if not self.enabled:
+            return
+        self._tournaments[tournament.id] = (
+            tournament.name,
+            tournament.max_players,
+            tournament.start_at,
+        )
+        self._tournaments.move_to_end(tournament.id)
+        while len(self._tournaments) > self.max_size:
+            self._tournaments.popitem(last=False)
+
+    def evict(self, tournament_id: int) -> None:
+        self._tournaments.pop(tournament_id, None)
+
+    def clear(self) -> None:
+        self._tournaments.clear()
+
+
+tournament_cache = TournamentCache(settings.cache_max_tournaments)
@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +10,26 @@ class Settings(BaseSettings):
     )
     debug: bool = False
 
+    # Storage backend: "sql" (database) or "memory" (in-memory + write-ahead log)
+    storage_backend: Literal["sql", "memory"] = "sql"
+    memory_data_dir: str = "data"
+    memory_fsync_interval_ms: float = 2.0
+    memory_snapshot_every: int = 10000
+
+    # Per-worker tournament cache, kept coherent via Postgres LISTEN/NOTIFY
+    cache_enabled: bool = True
+    cache_max_tournaments: int = 10000
+    cache_invalidation_debounce_ms: float = 50.0
+
+    # Per-tournament Bloom filters of registered emails
+    email_filter_enabled: bool = True
+    email_filter_error_rate: float = Field(0.01, gt=0, lt=1)
+    email_filter_max_capacity: int = Field(100000, gt=0)
+    email_filter_max_bytes: int = Field(32 * 1024 * 1024, gt=0)
+
+    # Log a warning when a route executes more queries than its budget
+    query_budget_warn: bool = False
+
     class Config:
         env_file = ".env"
 
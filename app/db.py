@@ -1,16 +1,45 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+# Created in the app lifespan (see ``init_engine``) rather than at import time,
+# so importing the app does not load the database driver.
+engine: Optional[AsyncEngine] = None
+async_session_maker: Optional[async_sessionmaker[AsyncSession]] = None
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_async_session() -> AsyncSession:
+def init_engine() -> AsyncEngine:
+    global engine, async_session_maker
+    if engine is None:
+        engine = create_async_engine(settings.database_url, echo=settings.debug)
+        async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine, async_session_maker
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    async_session_maker = None
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    if async_session_maker is None:
+        # Used outside the app lifespan (scripts, ad-hoc tooling)
+        init_engine()
+    assert async_session_maker is not None
     async with async_session_maker() as session:
         yield session
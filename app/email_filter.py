@@ -0,0 +1,127 @@
+import hashlib
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from app.config import settings
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    __slots__ = ("bits", "size", "hashes", "count")
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate for the items added so far."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class EmailFilterRegistry:
+    """Per-tournament Bloom filters of registered emails, bounded in bytes.
+
+    A miss means the email is definitely not registered and the existence
+    query can be skipped; a hit still has to be confirmed by the database.
+    Least recently used filters are dropped once ``max_bytes`` is exceeded
+    and rebuilt lazily on the next check.
+    """
+
+    def __init__(self, max_bytes: int, error_rate: float, max_capacity: int) -> None:
+        self.max_bytes = max_bytes
+        self.error_rate = error_rate
+        self.max_capacity = max_capacity
+        self._filters: OrderedDict[int, BloomFilter] = OrderedDict()
+        self._bytes = 0
+        self.checks = 0
+        self.skipped = 0
+        self.false_positives = 0
+
+    def get(self, tournament_id: int) -> Optional[BloomFilter]:
+        email_filter = self._filters.get(tournament_id)
+        if email_filter is not None:
+            self._filters.move_to_end(tournament_id)
+        return email_filter
+
+    def build(
+        self, tournament_id: int, capacity: int, emails: Iterable[str]
+    ) -> BloomFilter:
+        email_filter = BloomFilter(min(capacity, self.max_capacity), self.error_rate)
+        for email in emails:
+            email_filter.add(email)
+        self.discard(tournament_id)
+        self._filters[tournament_id] = email_filter
+        self._bytes += len(email_filter.bits)
+        while self._bytes > self.max_bytes and len(self._filters) > 1:
+            _, evicted = self._filters.popitem(last=False)
+            self._bytes -= len(evicted.bits)
+        return email_filter
+
+    def add(self, tournament_id: int, email: str) -> None:
+        email_filter = self._filters.get(tournament_id)
+        if email_filter is not None and email not in email_filter:
+            email_filter.add(email)
+
+    def discard(self, tournament_id: int) -> None:
+        email_filter = self._filters.pop(tournament_id, None)
+        if email_filter is not None:
+            self._bytes -= len(email_filter.bits)
+
+    def clear(self) -> None:
+        self._filters.clear()
+        self._bytes = 0
+
+    def record_check(self, maybe_registered: bool, registered: bool) -> None:
+        self.checks += 1
+        if not maybe_registered:
+            self.skipped += 1
+        elif not registered:
+            self.false_positives += 1
+
+    def stats(self) -> Dict[str, float]:
+        negatives = self.skipped + self.false_positives
+        expected = [f.false_positive_rate() for f in self._filters.values()]
+        return {
+            "filters": len(self._filters),
+            "bytes": self._bytes,
+            "checks": self.checks,
+            "queries_skipped": self.skipped,
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": (
+                self.false_positives / negatives if negatives else 0.0
+            ),
+            "expected_false_positive_rate": (
+                sum(expected) / len(expected) if expected else 0.0
+            ),
+        }
+
+
+email_filters = EmailFilterRegistry(
+    max_bytes=settings.email_filter_max_bytes,
+    error_rate=settings.email_filter_error_rate,
+    max_capacity=settings.email_filter_max_capacity,
+)
@@ -0,0 +1,164 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+QUERY_BUDGET_ATTR = "query_budget"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class QueryStats:
+    """Queries and database time seen within one request or ``count_queries`` block.
+
+    Stats nest: whatever is recorded in an inner block is added to the
+    enclosing ones too, so a test can count the queries of a whole request.
+    """
+
+    __slots__ = ("count", "duration", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.parent = parent
+
+    def record(self, duration: float) -> None:
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats = stats.parent
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    # Kept on the per-statement context: after_cursor_execute does not run
+    # for a failing statement, so anything stored on the pooled connection
+    # would pile up.
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(time.perf_counter() - context._query_start_time)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the SQL statements executed inside the block."""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    """Fail if the block executes more than ``budget`` SQL statements."""
+    with count_queries() as stats:
+        yield stats
+    assert (
+        stats.count <= budget
+    ), f"Expected at most {budget} queries, got {stats.count}"
+
+
+def query_budget(budget: int) -> Callable[[F], F]:
+    """Declare how many queries a route may execute on a cold cache."""
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, QUERY_BUDGET_ATTR, budget)
+        return endpoint
+
+    return decorator
+
+
+def get_query_budget(endpoint: Any) -> Optional[int]:
+    """Return the budget declared with ``query_budget``, if any."""
+    budget: Optional[int] = getattr(endpoint, QUERY_BUDGET_ATTR, None)
+    return budget
+
+
+class QueryStatsMiddleware:
+    """Expose per-request query count and DB time as headers and a log line.
+
+    With ``query_budget_warn`` enabled, requests whose route executed more
+    queries than its ``query_budget`` are logged as warnings.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode())
+                    )
+                    headers.append(
+                        (
+                            QUERY_TIME_HEADER.lower().encode(),
+                            f"{stats.duration * 1000:.2f}".encode(),
+                        )
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        logger.debug(
+            "%s %s: %d queries, %.2f ms in database",
+            scope["method"],
+            scope["path"],
+            stats.count,
+            stats.duration * 1000,
+        )
+        budget = get_query_budget(scope.get("endpoint"))
+        if settings.query_budget_warn and budget is not None and stats.count > budget:
+            logger.warning(
+                "%s %s executed %d queries, over its budget of %d",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                budget,
+            )
@@ -1,14 +1,54 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import configure_mappers
 
 from app.api.tournament import router as tournament_router
+from app.cache import tournament_cache
+from app.config import settings
+from app.db import dispose_engine, init_engine
+from app.email_filter import email_filters
+from app.instrumentation import QueryStatsMiddleware
+from app.notifications import InvalidationListener
+from app.repositories.memory import memory_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Resolve ORM relationships now instead of on the first request
+    configure_mappers()
+    listener = None
+    if settings.storage_backend == "memory":
+        await memory_store.open()
+    else:
+        init_engine()
+        if settings.cache_enabled and settings.database_url.startswith("postgresql"):
+            listener = InvalidationListener(
+                settings.database_url,
+                tournament_cache,
+                email_filters,
+                debounce=settings.cache_invalidation_debounce_ms / 1000,
+            )
+            listener.start()
+    yield
+    if settings.storage_backend == "memory":
+        await memory_store.close()
+    else:
+        if listener is not None:
+            await listener.stop()
+        await dispose_engine()
+
 
 app = FastAPI(
     title="Tournament System",
     description="A mini tournament system for player registration",
     version="0.1.0",
+    lifespan=lifespan,
 )
+app.add_middleware(QueryStatsMiddleware)
 
 
 @app.exception_handler(IntegrityError)
@@ -33,3 +73,8 @@ async def root() -> dict[str, str]:
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@app.get("/health/email-filters")
+async def email_filter_stats() -> dict[str, float]:
+    return email_filters.stats()
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TournamentCache
+from app.email_filter import EmailFilterRegistry
+from app.models.tournament import Tournament
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tournament_events"
+TOURNAMENT_CREATED = "tournament_created"
+PLAYER_REGISTERED = "player_registered"
+
+
+async def notify(
+    session: AsyncSession, event: str, tournament_id: int, detail: str = ""
+) -> None:
+    """Queue an invalidation message inside the session's transaction.
+
+    Postgres only delivers it once the transaction commits, so listeners
+    never act ahead of the write they are told about. Other dialects
+    (SQLite in tests) have no LISTEN/NOTIFY and are skipped.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = f"{event}:{tournament_id}:{detail}"
+    await session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+def encode_tournament(tournament: Tournament) -> str:
+    """Serialize a new tournament for the ``tournament_created`` payload."""
+    return json.dumps(
+        {
+            "name": tournament.name,
+            "max_players": tournament.max_players,
+            "start_at": tournament.start_at.isoformat(),
+        },
+        separators=(",", ":"),
+    )
+
+
+class InvalidationListener:
+    """One LISTEN connection per worker that keeps ``TournamentCache`` coherent.
+
+    Tournament rows never change once created, so a created tournament is
+    added to the cache rather than evicted, and registered emails go into
+    the email filters; both are applied right away. Any other event evicts
+    its tournament, collected for ``debounce`` seconds and applied in one
+    batch. The cache is disabled and flushed whenever the connection is lost
+    and flushed again once it is back, since anything sent in between was
+    missed; email filters are dropped then too and rebuilt lazily.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        cache: TournamentCache,
+        email_filters: EmailFilterRegistry,
+        debounce: float = 0.05,
+        keepalive: float = 30.0,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        url = make_url(database_url).set(drivername="postgresql")
+        self.dsn = url.render_as_string(hide_password=False)
+        self.cache = cache
+        self.email_filters = email_filters
+        self.debounce = debounce
+        self.keepalive = keepalive
+        self.reconnect_delay = reconnect_delay
+        self._dirty: Set[int] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._disconnected()
+
+    async def _run(self) -> None:
+        # Imported here so loading the app does not pull in the driver
+        import asyncpg
+
+        while True:
+            try:
+                await self._listen(asyncpg.connect)
+            except Exception:
+                # Any failure (including asyncpg's InterfaceError, which is
+                # neither an OSError nor a PostgresError) must end in a
+                # reconnect, or the cache would stay disabled for good.
+                logger.warning("Invalidation listener failed", exc_info=True)
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen(self, connect: Callable[[str], Awaitable[Any]]) -> None:
+        connection = await connect(self.dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(CHANNEL, self._on_notify)
+            self._connected()
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    await connection.execute("SELECT 1")
+            logger.warning("Invalidation listener connection closed")
+        finally:
+            self._disconnected()
+            if not connection.is_closed():
+                connection.terminate()
+
+    def _connected(self) -> None:
+        self.cache.clear()
+        self.email_filters.clear()
+        self.cache.enabled = True
+
+    def _disconnected(self) -> None:
+        self.cache.enabled = False
+        self.cache.clear()
+        self.email_filters.clear()
+        self._dirty.clear()
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        event, _, rest = payload.partition(":")
+        raw_id, _, detail = rest.partition(":")
+        try:
+            tournament_id = int(raw_id)
+            if event == TOURNAMENT_CREATED:
+                self._cache_created(tournament_id, detail)
+                return
+        except (TypeError, ValueError, KeyError):
+            logger.warning("Ignoring malformed invalidation payload %r", payload)
+            return
+        if event == PLAYER_REGISTERED:
+            # Registrations do not change cached tournament rows
+            if detail:
+                self.email_filters.add(tournament_id, detail)
+            return
+        # Unknown events (say, from a newer worker mid-deploy) evict
+        self._dirty.add(tournament_id)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.debounce, self._flush
+            )
+
+    def _cache_created(self, tournament_id: int, detail: str) -> None:
+        data = json.loads(detail)
+        self.cache.put_tournament(
+            Tournament(
+                id=tournament_id,
+                name=data["name"],
+                max_players=data["max_players"],
+                start_at=datetime.fromisoformat(data["start_at"]),
+            )
+        )
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        for tournament_id in dirty:
+            self.cache.evict(tournament_id)
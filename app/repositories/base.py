@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional, Protocol, Sequence
+
+from app.schemas.tournament import PlayerCreate, TournamentCreate
+
+
+class TournamentData(Protocol):
+    @property
+    def id(self) -> int: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def max_players(self) -> int: ...
+
+    @property
+    def start_at(self) -> datetime: ...
+
+
+class PlayerData(Protocol):
+    @property
+    def id(self) -> int: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def email(self) -> str: ...
+
+    @property
+    def tournament_id(self) -> int: ...
+
+
+class TournamentRepositoryProtocol(Protocol):
+    """Storage interface shared by the SQL and in-memory backends."""
+
+    async def create_tournament(
+        self, tournament_data: TournamentCreate
+    ) -> TournamentData: ...
+
+    async def get_tournament_by_id(
+        self, tournament_id: int
+    ) -> Optional[TournamentData]: ...
+
+    async def get_tournament_with_players(
+        self, tournament_id: int
+    ) -> Optional[TournamentData]: ...
+
+    async def get_players_count(self, tournament_id: int) -> int: ...
+
+    async def register_player(
+        self, tournament_id: int, player_data: PlayerCreate
+    ) -> PlayerData: ...
+
+    async def check_player_exists(self, tournament_id: int, email: str) -> bool: ...
+
+    async def get_tournament_players(
+        self, tournament_id: int
+    ) -> Sequence[PlayerData]: ...
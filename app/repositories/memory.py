@@ -0,0 +1,487 @@
+import asyncio
+import errno
+import fcntl
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.schemas.tournament import PlayerCreate, TournamentCreate
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = "lock"
+SNAPSHOT_FILE = "snapshot.json"
+WAL_PREFIX = "wal-"
+WAL_SUFFIX = ".log"
+
+
+class PlayerRecord:
+    __slots__ = ("id", "name", "email", "tournament_id")
+
+    def __init__(self, id: int, name: str, email: str, tournament_id: int) -> None:
+        self.id = id
+        self.name = name
+        self.email = email
+        self.tournament_id = tournament_id
+
+
+class TournamentRecord:
+    __slots__ = ("id", "name", "max_players", "start_at", "players", "emails")
+
+    def __init__(
+        self, id: int, name: str, max_players: int, start_at: datetime
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.max_players = max_players
+        self.start_at = start_at
+        self.players: List[PlayerRecord] = []
+        self.emails: Set[str] = set()
+
+
+class WalFailedError(OSError):
+    """Raised for writes attempted after the write-ahead log failed an fsync."""
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log split into segments, fsynced in groups.
+
+    Every append waits until its record is on disk, but all appends that
+    arrive within ``fsync_interval`` seconds share a single fsync. If an
+    fsync fails, the segment is cut back to the last synced size, every
+    unacknowledged append fails and the log refuses further writes, so a
+    record reported as failed can never resurface after recovery.
+    """
+
+    def __init__(self, directory: Path, fsync_interval: float) -> None:
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.failed: Optional[OSError] = None
+        self._fd: Optional[int] = None
+        self._path: Optional[Path] = None
+        self._synced_size: Dict[int, int] = {}
+        self._pending: List["asyncio.Future[None]"] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._syncing: Set["asyncio.Task[None]"] = set()
+        self._sync_lock = asyncio.Lock()
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{WAL_PREFIX}*{WAL_SUFFIX}"))
+
+    def replay(self, after_seq: int) -> Iterator[Dict[str, Any]]:
+        for segment in self.segments():
+            with segment.open("r+b") as file:
+                offset = 0
+                for line in iter(file.readline, b""):
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write at the tail of a segment: the append was
+                        # never acknowledged, so cut it off before reusing.
+                        file.truncate(offset)
+                        break
+                    offset += len(line)
+                    if record["seq"] > after_seq:
+                        yield record
+
+    def open(self, start_seq: int) -> None:
+        self._path = self.directory / f"{WAL_PREFIX}{start_seq:020d}{WAL_SUFFIX}"
+        # Unbuffered: every record goes straight to the OS, so nothing is
+        # left in a user-space buffer that could be written after a failure.
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._synced_size[self._fd] = os.fstat(self._fd).st_size
+
+    async def append(self, record: Dict[str, Any]) -> None:
+        assert self._fd is not None, "write-ahead log is not open"
+        self.check()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        os.write(self._fd, line.encode())
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.fsync_interval, self._flush
+            )
+        await future
+
+    def check(self) -> None:
+        """Raise ``WalFailedError`` if an earlier fsync has failed."""
+        if self.failed is not None:
+            raise self._failed_error()
+
+    async def rotate(self, start_seq: int) -> None:
+        """Switch appends to a new segment and close the previous one."""
+        self.check()
+        fd = self._detach()
+        self.open(start_seq)
+        if fd is not None:
+            await self._drain(fd)
+
+    async def close(self) -> None:
+        fd = self._detach()
+        if fd is not None:
+            await self._drain(fd)
+
+    def prune(self) -> None:
+        """Delete every segment except the one currently being written."""
+        for segment in self.segments():
+            if segment != self._path:
+                segment.unlink()
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if self._fd is None or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._sync(self._fd, pending))
+        self._syncing.add(task)
+        task.add_done_callback(self._syncing.discard)
+
+    def _detach(self) -> Optional[int]:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush()
+        fd, self._fd = self._fd, None
+        return fd
+
+    async def _drain(self, fd: int) -> None:
+        if self._syncing:
+            await asyncio.gather(*self._syncing, return_exceptions=True)
+        self._synced_size.pop(fd, None)
+        os.close(fd)
+
+    async def _sync(self, fd: int, pending: List["asyncio.Future[None]"]) -> None:
+        # One fsync at a time, so the synced size only ever moves forward.
+        async with self._sync_lock:
+            if self.failed is None:
+                try:
+                    size = os.fstat(fd).st_size
+                    await asyncio.get_running_loop().run_in_executor(None, os.fsync, fd)
+                except OSError as exc:
+                    self.failed = exc
+                else:
+                    self._synced_size[fd] = size
+                    for future in pending:
+                        if not future.done():
+                            future.set_result(None)
+                    return
+
+            self._discard_unsynced(fd)
+            if self._fd is not None:
+                self._discard_unsynced(self._fd)
+            for future in pending + self._pending:
+                if not future.done():
+                    future.set_exception(self._failed_error())
+            self._pending = []
+
+    def _failed_error(self) -> WalFailedError:
+        # A fresh exception per caller: re-raising the stored one would
+        # keep growing its traceback, and with it every frame it passed.
+        error = WalFailedError(errno.EIO, "write-ahead log failed")
+        error.__cause__ = self.failed
+        return error
+
+    def _discard_unsynced(self, fd: int) -> None:
+        try:
+            os.ftruncate(fd, self._synced_size[fd])
+        except OSError:
+            pass
+
+
+class MemoryStore:
+    """Tournaments and players held in memory, made durable by a WAL.
+
+    Mutations are applied to memory first (so ids and the one-email-per-
+    tournament rule are decided atomically on the event loop) and then
+    acknowledged once their WAL record is fsynced. Every
+    ``snapshot_every`` mutations the whole state is written to a snapshot
+    and older WAL segments are removed, keeping recovery short. After a
+    failed fsync the store rejects writes until it is restarted.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        fsync_interval_ms: float = 2.0,
+        snapshot_every: int = 10000,
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.snapshot_every = snapshot_every
+        self.wal = WriteAheadLog(self.data_dir, fsync_interval_ms / 1000)
+        self.tournaments: Dict[int, TournamentRecord] = {}
+        self._next_tournament_id = 1
+        self._next_player_id = 1
+        self._seq = 0
+        self._since_snapshot = 0
+        self._snapshot_task: Optional["asyncio.Task[None]"] = None
+        self._lock_fd: Optional[int] = None
+
+    async def open(self) -> None:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._acquire_lock()
+        self._load_snapshot()
+        for record in self.wal.replay(self._seq):
+            self._apply(record)
+        self.wal.open(self._seq + 1)
+
+    async def close(self) -> None:
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if self.wal.failed is None:
+            await self.snapshot()
+        await self.wal.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _acquire_lock(self) -> None:
+        # The store assumes a single writer; a second worker pointed at the
+        # same directory would interleave appends and prune live segments.
+        fd = os.open(self.data_dir / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(
+                f"{self.data_dir} is already in use by another process; "
+                "the memory backend supports a single worker only"
+            ) from None
+        self._lock_fd = fd
+
+    async def create_tournament(
+        self, name: str, max_players: int, start_at: datetime
+    ) -> TournamentRecord:
+        record: Dict[str, Any] = {
+            "op": "tournament",
+            "id": self._next_tournament_id,
+            "name": name,
+            "max_players": max_players,
+            "start_at": start_at.isoformat(),
+        }
+        tournament = self._apply_tournament(self._sequence(record))
+        try:
+            await self.wal.append(record)
+        except OSError:
+            del self.tournaments[tournament.id]
+            raise
+        self._after_mutation()
+        return tournament
+
+    async def register_player(
+        self, tournament_id: int, name: str, email: str
+    ) -> PlayerRecord:
+        tournament = self.tournaments.get(tournament_id)
+        if tournament is None:
+            raise _integrity_error("players_tournament_id_fkey")
+        if email in tournament.emails:
+            raise _integrity_error("uq_email_tournament")
+
+        record: Dict[str, Any] = {
+            "op": "player",
+            "id": self._next_player_id,
+            "tournament_id": tournament_id,
+            "name": name,
+            "email": email,
+        }
+        player = self._apply_player(self._sequence(record))
+        try:
+            await self.wal.append(record)
+        except OSError:
+            tournament.players.remove(player)
+            tournament.emails.discard(email)
+            raise
+        self._after_mutation()
+        return player
+
+    async def snapshot(self) -> None:
+        """Write the current state to disk and drop the WAL it covers."""
+        seq = self._seq
+        state = self._dump()
+        self._since_snapshot = 0
+        await self.wal.rotate(seq + 1)
+        # The dump may include mutations whose fsync has just failed
+        self.wal.check()
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_snapshot, state
+        )
+        self.wal.prune()
+
+    def _sequence(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self._seq += 1
+        record["seq"] = self._seq
+        return record
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        if record["op"] == "tournament":
+            self._apply_tournament(record)
+        else:
+            self._apply_player(record)
+
+    def _apply_tournament(self, record: Dict[str, Any]) -> TournamentRecord:
+        self._seq = max(self._seq, record["seq"])
+        tournament = TournamentRecord(
+            id=record["id"],
+            name=record["name"],
+            max_players=record["max_players"],
+            start_at=datetime.fromisoformat(record["start_at"]),
+        )
+        self.tournaments[tournament.id] = tournament
+        self._next_tournament_id = max(self._next_tournament_id, tournament.id + 1)
+        return tournament
+
+    def _apply_player(self, record: Dict[str, Any]) -> PlayerRecord:
+        self._seq = max(self._seq, record["seq"])
+        player = PlayerRecord(
+            id=record["id"],
+            name=record["name"],
+            email=record["email"],
+            tournament_id=record["tournament_id"],
+        )
+        tournament = self.tournaments[player.tournament_id]
+        tournament.players.append(player)
+        tournament.emails.add(player.email)
+        self._next_player_id = max(self._next_player_id, player.id + 1)
+        return player
+
+    def _after_mutation(self) -> None:
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every and self._snapshot_task is None:
+            self._snapshot_task = asyncio.get_running_loop().create_task(
+                self._background_snapshot()
+            )
+
+    async def _background_snapshot(self) -> None:
+        try:
+            await self.snapshot()
+        except OSError:
+            logger.exception("Snapshot of %s failed", self.data_dir)
+        finally:
+            self._snapshot_task = None
+
+    def _dump(self) -> Dict[str, Any]:
+        return {
+            "seq": self._seq,
+            "tournaments": [
+                {
+                    "id": tournament.id,
+                    "name": tournament.name,
+                    "max_players": tournament.max_players,
+                    "start_at": tournament.start_at.isoformat(),
+                    "players": [
+                        [player.id, player.name, player.email]
+                        for player in tournament.players
+                    ],
+                }
+                for tournament in self.tournaments.values()
+            ],
+        }
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        path = self.data_dir / SNAPSHOT_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(state, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        dir_fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _load_snapshot(self) -> None:
+        path = self.data_dir / SNAPSHOT_FILE
+        if not path.exists():
+            return
+        with path.open("r", encoding="utf-8") as file:
+            state = json.load(file)
+        for item in state["tournaments"]:
+            self._apply(
+                {
+                    "op": "tournament",
+                    "seq": state["seq"],
+                    "id": item["id"],
+                    "name": item["name"],
+                    "max_players": item["max_players"],
+                    "start_at": item["start_at"],
+                }
+            )
+            for player_id, name, email in item["players"]:
+                self._apply(
+                    {
+                        "op": "player",
+                        "seq": state["seq"],
+                        "id": player_id,
+                        "tournament_id": item["id"],
+                        "name": name,
+                        "email": email,
+                    }
+                )
+        self._seq = state["seq"]
+
+
+def _integrity_error(constraint: str) -> IntegrityError:
+    # Mirror what the database would raise so the app's IntegrityError
+    # handler answers the same way for both backends.
+    return IntegrityError("INSERT INTO players", None, ValueError(constraint))
+
+
+class MemoryTournamentRepository:
+    """Drop-in replacement for ``TournamentRepository`` backed by ``MemoryStore``."""
+
+    def __init__(self, store: MemoryStore) -> None:
+        self.store = store
+
+    async def create_tournament(
+        self, tournament_data: TournamentCreate
+    ) -> TournamentRecord:
+        return await self.store.create_tournament(
+            name=tournament_data.name,
+            max_players=tournament_data.max_players,
+            start_at=tournament_data.start_at,
+        )
+
+    async def get_tournament_by_id(
+        self, tournament_id: int
+    ) -> Optional[TournamentRecord]:
+        return self.store.tournaments.get(tournament_id)
+
+    async def get_tournament_with_players(
+        self, tournament_id: int
+    ) -> Optional[TournamentRecord]:
+        return self.store.tournaments.get(tournament_id)
+
+    async def get_players_count(self, tournament_id: int) -> int:
+        tournament = self.store.tournaments.get(tournament_id)
+        return len(tournament.players) if tournament else 0
+
+    async def register_player(
+        self, tournament_id: int, player_data: PlayerCreate
+    ) -> PlayerRecord:
+        return await self.store.register_player(
+            tournament_id, name=player_data.name, email=player_data.email
+        )
+
+    async def check_player_exists(self, tournament_id: int, email: str) -> bool:
+        tournament = self.store.tournaments.get(tournament_id)
+        return tournament is not None and email in tournament.emails
+
+    async def get_tournament_players(self, tournament_id: int) -> List[PlayerRecord]:
+        tournament = self.store.tournaments.get(tournament_id)
+        return list(tournament.players) if tournament else []
+
+
+memory_store = MemoryStore(
+    settings.memory_data_dir,
+    fsync_interval_ms=settings.memory_fsync_interval_ms,
+    snapshot_every=settings.memory_snapshot_every,
+)
@@ -1,16 +1,36 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.cache import TournamentCache, tournament_cache
+from app.config import settings
+from app.email_filter import BloomFilter, EmailFilterRegistry, email_filters
 from app.models.tournament import Player, Tournament
+from app.notifications import (
+    PLAYER_REGISTERED,
+    TOURNAMENT_CREATED,
+    encode_tournament,
+    notify,
+)
 from app.schemas.tournament import PlayerCreate, TournamentCreate
 
 
 class TournamentRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: TournamentCache = tournament_cache,
+        email_filters: EmailFilterRegistry = email_filters,
+    ) -> None:
         self.session = session
+        self.cache = cache
+        self.email_filters = email_filters
+        # max_players of tournaments loaded through this repository, used to
+        # size email filters without fetching the tournament a second time
+        self._capacities: Dict[int, int] = {}
 
     async def create_tournament(self, tournament_data: TournamentCreate) -> Tournament:
         tournament = Tournament(
@@ -19,14 +39,30 @@ class TournamentRepository:
             start_at=tournament_data.start_at,
         )
         self.session.add(tournament)
+        await self.session.flush()
+        await notify(
+            self.session,
+            TOURNAMENT_CREATED,
+            tournament.id,
+            encode_tournament(tournament),
+        )
         await self.session.commit()
         await self.session.refresh(tournament)
+        self._remember(tournament)
         return tournament
 
     async def get_tournament_by_id(self, tournament_id: int) -> Optional[Tournament]:
+        cached = self.cache.get_tournament(tournament_id)
+        if cached is not None:
+            self._capacities[tournament_id] = cached.max_players
+            return cached
+
         stmt = select(Tournament).where(Tournament.id == tournament_id)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        tournament = result.scalar_one_or_none()
+        if tournament is not None:
+            self._remember(tournament)
+        return tournament
 
     async def get_tournament_with_players(
         self, tournament_id: int
@@ -40,6 +76,7 @@ class TournamentRepository:
         return result.scalar_one_or_none()
 
     async def get_players_count(self, tournament_id: int) -> int:
+        # Never cached: this count enforces max_players
         stmt = select(func.count(Player.id)).where(
             Player.tournament_id == tournament_id
         )
@@ -55,16 +92,56 @@ class TournamentRepository:
             tournament_id=tournament_id,
         )
         self.session.add(player)
-        await self.session.commit()
+        try:
+            await notify(
+                self.session, PLAYER_REGISTERED, tournament_id, player_data.email
+            )
+            await self.session.commit()
+        except IntegrityError:
+            # A duplicate slipped past a stale filter; remember it this time.
+            self.email_filters.add(tournament_id, player_data.email)
+            raise
         await self.session.refresh(player)
+        self.email_filters.add(tournament_id, player_data.email)
         return player
 
     async def check_player_exists(self, tournament_id: int, email: str) -> bool:
+        email_filter = await self._get_email_filter(tournament_id)
+        maybe_registered = email_filter is None or email in email_filter
+        if not maybe_registered:
+            self.email_filters.record_check(maybe_registered=False, registered=False)
+            return False
+
         stmt = select(Player).where(
             Player.tournament_id == tournament_id, Player.email == email
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        registered = result.scalar_one_or_none() is not None
+        if email_filter is not None:
+            self.email_filters.record_check(
+                maybe_registered=True, registered=registered
+            )
+        return registered
+
+    def _remember(self, tournament: Tournament) -> None:
+        self._capacities[tournament.id] = tournament.max_players
+        self.cache.put_tournament(tournament)
+
+    async def _get_email_filter(self, tournament_id: int) -> Optional[BloomFilter]:
+        if not settings.email_filter_enabled:
+            return None
+        email_filter = self.email_filters.get(tournament_id)
+        if email_filter is not None:
+            return email_filter
+
+        # A filter is only built for a tournament this repository has loaded,
+        # rather than spending a query on its size.
+        capacity = self._capacities.get(tournament_id)
+        if capacity is None:
+            return None
+        stmt = select(Player.email).where(Player.tournament_id == tournament_id)
+        result = await self.session.execute(stmt)
+        return self.email_filters.build(tournament_id, capacity, result.scalars().all())
 
     async def get_tournament_players(self, tournament_id: int) -> List[Player]:
         stmt = select(Player).where(Player.tournament_id == tournament_id)
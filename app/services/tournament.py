@@ -1,9 +1,10 @@
 from typing import List
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 
 from app.models.tournament import Player, Tournament
-from app.repositories.tournament import TournamentRepository
+from app.repositories.base import TournamentRepositoryProtocol
 from app.schemas.tournament import (
     PlayerCreate,
     PlayerRegistrationResponse,
@@ -14,8 +15,18 @@ from app.schemas.tournament import (
 )
 
 
+def _is_duplicate_email(exc: IntegrityError) -> bool:
+    # Postgres and the memory backend name the constraint; SQLite lists
+    # its columns instead.
+    message = str(exc.orig)
+    return (
+        "uq_email_tournament" in message
+        or "UNIQUE constraint failed: players.email, players.tournament_id" in message
+    )
+
+
 class TournamentService:
-    def __init__(self, repository: TournamentRepository) -> None:
+    def __init__(self, repository: TournamentRepositoryProtocol) -> None:
         self.repository = repository
 
     async def create_tournament(
@@ -56,8 +67,16 @@ class TournamentService:
                 detail="Tournament is full",
             )
 
-        # Register player
-        player = await self.repository.register_player(tournament_id, player_data)
+        # Register player; the unique constraint is the final duplicate check
+        try:
+            player = await self.repository.register_player(tournament_id, player_data)
+        except IntegrityError as exc:
+            if not _is_duplicate_email(exc):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Player with this email is already registered for this tournament",
+            ) from exc
         return PlayerRegistrationResponse(
             id=player.id,
             name=player.name,
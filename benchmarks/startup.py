@@ -0,0 +1,102 @@
+"""Measure cold-start cost of the API.
+
+Reports two numbers, each as the median of several fresh interpreter runs:
+
+* import time of ``app.main``;
+* time from launching uvicorn until the first successful request.
+
+Usage::
+
+    python benchmarks/startup.py [--runs 5] [--path /health]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def measure_first_request(path: str, env: dict[str, str], timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"{url} did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {**os.environ, "MEMORY_DATA_DIR": data_dir}
+        import_times = [measure_import() for _ in range(args.runs)]
+        request_times = [
+            measure_first_request(args.path, env, args.timeout)
+            for _ in range(args.runs)
+        ]
+
+    print(
+        json.dumps(
+            {
+                "runs": args.runs,
+                "import_ms": round(statistics.median(import_times) * 1000, 1),
+                "first_request_ms": round(statistics.median(request_times) * 1000, 1),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
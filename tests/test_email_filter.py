@@ -0,0 +1,68 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.email_filter import BloomFilter, EmailFilterRegistry
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test every added email is reported as possibly present."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    emails = [f"player{i}@example.com" for i in range(1000)]
+    for email in emails:
+        bloom.add(email)
+
+    assert all(email in bloom for email in emails)
+
+
+def test_bloom_filter_false_positive_rate_near_target():
+    """Test the measured false-positive rate stays close to the configured one."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"player{i}@example.com")
+
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10000))
+    assert false_positives / 10000 < 0.03
+    assert 0.005 < bloom.false_positive_rate() < 0.02
+
+
+def test_registry_evicts_least_recently_used_filters():
+    """Test total filter memory is bounded across many tournaments."""
+    registry = EmailFilterRegistry(max_bytes=4096, error_rate=0.01, max_capacity=1000)
+    for tournament_id in range(1, 11):
+        registry.build(tournament_id, capacity=1000, emails=[])
+
+    assert registry.stats()["bytes"] <= 4096
+    assert registry.get(1) is None
+    assert registry.get(10) is not None
+
+
+def test_registry_reports_false_positive_rate():
+    """Test skipped queries and false positives are counted."""
+    registry = EmailFilterRegistry(max_bytes=4096, error_rate=0.01, max_capacity=100)
+    registry.record_check(maybe_registered=False, registered=False)
+    registry.record_check(maybe_registered=False, registered=False)
+    registry.record_check(maybe_registered=False, registered=False)
+    registry.record_check(maybe_registered=True, registered=False)
+    registry.record_check(maybe_registered=True, registered=True)
+
+    stats = registry.stats()
+    assert stats["checks"] == 5
+    assert stats["queries_skipped"] == 3
+    assert stats["false_positives"] == 1
+    assert stats["observed_false_positive_rate"] == 0.25
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"email_filter_error_rate": 0},
+        {"email_filter_error_rate": 1},
+        {"email_filter_max_capacity": 0},
+        {"email_filter_max_bytes": 0},
+    ],
+)
+def test_invalid_email_filter_settings_are_rejected(override):
+    """Test settings that would break every filter fail at startup instead."""
+    with pytest.raises(ValidationError):
+        Settings(**override)
@@ -0,0 +1,137 @@
+import errno
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.repositories.memory import MemoryStore, WalFailedError
+
+START_AT = datetime(2025, 12, 1, 15, 0, tzinfo=timezone.utc)
+
+
+async def open_store(path, **kwargs) -> MemoryStore:
+    store = MemoryStore(str(path), fsync_interval_ms=0, **kwargs)
+    await store.open()
+    return store
+
+
+async def crash(store: MemoryStore) -> None:
+    """Drop the store like a killed process: no snapshot, lock released."""
+    await store.wal.close()
+    assert store._lock_fd is not None
+    os.close(store._lock_fd)
+
+
+async def test_recovers_from_wal_after_crash(tmp_path):
+    """Test state is rebuilt from the WAL when no snapshot was taken."""
+    store = await open_store(tmp_path)
+    tournament = await store.create_tournament("Cup", 4, START_AT)
+    await store.register_player(tournament.id, "John Doe", "john@example.com")
+    # Simulate a crash: the store is never closed, so no snapshot is written.
+    await crash(store)
+
+    recovered = await open_store(tmp_path)
+    restored = recovered.tournaments[tournament.id]
+    assert restored.name == "Cup"
+    assert restored.start_at == START_AT
+    assert [player.email for player in restored.players] == ["john@example.com"]
+    assert "john@example.com" in restored.emails
+
+    # New ids continue after the recovered ones.
+    second = await recovered.create_tournament("Second Cup", 4, START_AT)
+    assert second.id == tournament.id + 1
+    await recovered.close()
+
+
+async def test_snapshot_replaces_old_wal_segments(tmp_path):
+    """Test periodic snapshots prune the WAL and are used on recovery."""
+    store = await open_store(tmp_path, snapshot_every=2)
+    tournament = await store.create_tournament("Cup", 4, START_AT)
+    await store.register_player(tournament.id, "John Doe", "john@example.com")
+    await store._snapshot_task
+    await store.register_player(tournament.id, "Jane Doe", "jane@example.com")
+    await crash(store)
+
+    assert (tmp_path / "snapshot.json").exists()
+    assert len(store.wal.segments()) == 1
+
+    recovered = await open_store(tmp_path)
+    emails = [player.email for player in recovered.tournaments[tournament.id].players]
+    assert emails == ["john@example.com", "jane@example.com"]
+    await recovered.close()
+
+
+async def test_torn_wal_tail_is_discarded(tmp_path):
+    """Test a partially written last record is dropped on recovery."""
+    store = await open_store(tmp_path)
+    tournament = await store.create_tournament("Cup", 4, START_AT)
+    await crash(store)
+    segment = store.wal.segments()[-1]
+    with segment.open("a", encoding="utf-8") as file:
+        file.write('{"seq": 2, "op": "pla')
+
+    recovered = await open_store(tmp_path)
+    assert recovered.tournaments[tournament.id].players == []
+    await recovered.register_player(tournament.id, "John Doe", "john@example.com")
+    await crash(recovered)
+
+    again = await open_store(tmp_path)
+    assert len(again.tournaments[tournament.id].players) == 1
+    await again.close()
+
+
+async def test_duplicate_email_raises_integrity_error(tmp_path):
+    """Test the one-email-per-tournament rule matches the database constraint."""
+    store = await open_store(tmp_path)
+    tournament = await store.create_tournament("Cup", 4, START_AT)
+    await store.register_player(tournament.id, "John Doe", "john@example.com")
+
+    with pytest.raises(IntegrityError):
+        await store.register_player(tournament.id, "John Two", "john@example.com")
+    with pytest.raises(IntegrityError):
+        await store.register_player(999, "John Doe", "john@example.com")
+    await store.close()
+
+
+async def test_failed_fsync_is_not_recovered(tmp_path, monkeypatch):
+    """Test a write whose fsync failed never reappears and later writes fail."""
+    store = await open_store(tmp_path)
+    tournament = await store.create_tournament("Cup", 4, START_AT)
+
+    real_fsync = os.fsync
+
+    def failing_fsync(fd: int) -> None:
+        monkeypatch.setattr(os, "fsync", real_fsync)
+        raise OSError(errno.EIO, "fsync failed")
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    with pytest.raises(WalFailedError) as first:
+        await store.register_player(tournament.id, "A", "a@e.com")
+    assert store.tournaments[tournament.id].players == []
+
+    # The store stops accepting writes instead of fsyncing the failed bytes
+    with pytest.raises(WalFailedError) as second:
+        await store.register_player(tournament.id, "B", "b@e.com")
+    await store.close()
+
+    # Each caller gets its own error chained to the fsync failure, so no
+    # single exception accumulates the tracebacks of every rejected write.
+    assert first.value is not second.value
+    assert first.value.__cause__ is second.value.__cause__ is store.wal.failed
+
+    recovered = await open_store(tmp_path)
+    assert recovered.tournaments[tournament.id].players == []
+    await recovered.close()
+
+
+async def test_second_process_cannot_open_same_directory(tmp_path):
+    """Test the data directory is locked to a single store at a time."""
+    store = await open_store(tmp_path)
+
+    with pytest.raises(RuntimeError, match="already in use"):
+        await open_store(tmp_path)
+
+    await store.close()
+    reopened = await open_store(tmp_path)
+    await reopened.close()
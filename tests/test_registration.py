@@ -1,11 +1,35 @@
+import logging
+
 import pytest
 from datetime import datetime, timezone
+from typing import Any
+from fastapi import HTTPException
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.cache import TournamentCache, tournament_cache
+from app.api.tournament import (
+    create_tournament,
+    get_tournament_players,
+    get_tournament_repository,
+    register_player,
+)
 from app.db import get_async_session, Base
+from app.email_filter import EmailFilterRegistry, email_filters
+from app.instrumentation import (
+    QUERY_BUDGET_ATTR,
+    assert_max_queries,
+    count_queries,
+    get_query_budget,
+)
+from app.repositories.tournament import TournamentRepository
+from app.schemas.tournament import PlayerCreate, TournamentCreate
+from app.services.tournament import TournamentService
+from app.repositories.memory import MemoryStore, MemoryTournamentRepository
 
 # Test database URL (in-memory SQLite for testing)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -34,6 +58,20 @@ async def get_test_session() -> AsyncSession:
 app.dependency_overrides[get_async_session] = get_test_session
 
 
+@pytest.fixture(autouse=True)
+def reset_worker_state():
+    """Drop per-worker filters and cache entries left by earlier tests.
+
+    Tournament ids restart with every fresh database, so leftovers would be
+    picked up by the next test's tournament with the same id.
+    """
+    email_filters.clear()
+    tournament_cache.clear()
+    yield
+    email_filters.clear()
+    tournament_cache.clear()
+
+
 @pytest.fixture
 async def setup_database():
     """Create tables before tests and drop them after."""
@@ -44,8 +82,25 @@ async def setup_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(params=["sql", "memory"])
+async def backend(request, setup_database, tmp_path):
+    """Run every API test against both storage backends."""
+    if request.param == "sql":
+        yield request.param
+        return
+
+    store = MemoryStore(str(tmp_path), fsync_interval_ms=0)
+    await store.open()
+    app.dependency_overrides[get_tournament_repository] = (
+        lambda: MemoryTournamentRepository(store)
+    )
+    yield request.param
+    app.dependency_overrides.pop(get_tournament_repository)
+    await store.close()
+
+
 @pytest.fixture
-async def client(setup_database):
+async def client(backend):
     """Create test client."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -138,6 +193,99 @@ async def test_register_player_duplicate_email(
     assert "already registered" in response.json()["detail"]
 
 
+async def test_register_player_duplicate_email_stale_filter(
+    client: AsyncClient, sample_tournament_data, sample_player_data
+):
+    """Test the unique constraint still rejects duplicates a stale filter misses."""
+    tournament_response = await client.post(
+        "/api/v1/tournaments", json=sample_tournament_data
+    )
+    tournament_id = tournament_response.json()["id"]
+    await client.post(
+        f"/api/v1/tournaments/{tournament_id}/register", json=sample_player_data
+    )
+
+    # Simulate a filter that never saw the first registration
+    email_filters.build(tournament_id, capacity=2, emails=[])
+
+    response = await client.post(
+        f"/api/v1/tournaments/{tournament_id}/register", json=sample_player_data
+    )
+
+    assert response.status_code == 400
+    assert "already registered" in response.json()["detail"]
+
+
+async def test_cold_registration_loads_tournament_once(
+    client: AsyncClient, sample_tournament_data, sample_player_data
+):
+    """Test building the email filter reuses the tournament the service loaded."""
+    tournament_response = await client.post(
+        "/api/v1/tournaments", json=sample_tournament_data
+    )
+    tournament_id = tournament_response.json()["id"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await client.post(
+            f"/api/v1/tournaments/{tournament_id}/register", json=sample_player_data
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    assert sum("FROM tournaments" in statement for statement in statements) <= 1
+
+
+async def test_email_filter_sized_from_loaded_tournament(setup_database):
+    """Test the repository sizes filters from tournaments it loaded itself."""
+    registry = EmailFilterRegistry(max_bytes=1024, error_rate=0.01, max_capacity=100)
+    tournament_data = TournamentCreate(
+        name="Cup", max_players=8, start_at=datetime(2025, 12, 1, tzinfo=timezone.utc)
+    )
+    async with TestSessionLocal() as session:
+        repository = TournamentRepository(session, email_filters=registry)
+        tournament = await repository.create_tournament(tournament_data)
+
+    async with TestSessionLocal() as session:
+        repository = TournamentRepository(session, email_filters=registry)
+        # Without the tournament loaded there is no size, so no filter
+        assert not await repository.check_player_exists(tournament.id, "a@e.com")
+        assert registry.get(tournament.id) is None
+
+        await repository.get_tournament_by_id(tournament.id)
+        assert not await repository.check_player_exists(tournament.id, "a@e.com")
+        assert registry.get(tournament.id) is not None
+    assert email_filters.get(tournament.id) is None
+
+
+async def test_only_duplicate_email_violation_is_translated(tmp_path, monkeypatch):
+    """Test other integrity errors reach the app-level handler untouched."""
+    store = MemoryStore(str(tmp_path), fsync_interval_ms=0)
+    await store.open()
+    tournament = await store.create_tournament(
+        "Cup", 8, datetime(2025, 12, 1, tzinfo=timezone.utc)
+    )
+    repository = MemoryTournamentRepository(store)
+
+    async def stale_tournament(tournament_id):
+        return tournament
+
+    # The tournament disappears between the checks and the insert
+    monkeypatch.setattr(repository, "get_tournament_by_id", stale_tournament)
+    del store.tournaments[tournament.id]
+
+    with pytest.raises(IntegrityError, match="players_tournament_id_fkey"):
+        await TournamentService(repository).register_player(
+            tournament.id, PlayerCreate(name="John Doe", email="john@example.com")
+        )
+    await store.close()
+
+
 async def test_register_player_tournament_full(
     client: AsyncClient, sample_tournament_data, sample_player_data
 ):
@@ -169,6 +317,36 @@ async def test_register_player_tournament_full(
     assert "Tournament is full" in response.json()["detail"]
 
 
+async def test_full_check_ignores_stale_worker_cache(setup_database):
+    """Test a worker that missed another worker's registration cannot overfill."""
+    worker_a, worker_b = TournamentCache(10), TournamentCache(10)
+    worker_a.enabled = worker_b.enabled = True
+    tournament_data = TournamentCreate(
+        name="Cup", max_players=1, start_at=datetime(2025, 12, 1, tzinfo=timezone.utc)
+    )
+
+    async with TestSessionLocal() as session:
+        repository_a = TournamentRepository(session, cache=worker_a)
+        tournament = await repository_a.create_tournament(tournament_data)
+        # Worker A has seen the tournament with no players
+        assert await repository_a.get_players_count(tournament.id) == 0
+
+    # Worker B fills the tournament; worker A is never notified about it
+    async with TestSessionLocal() as session:
+        service_b = TournamentService(TournamentRepository(session, cache=worker_b))
+        await service_b.register_player(
+            tournament.id, PlayerCreate(name="John Doe", email="john@example.com")
+        )
+
+    async with TestSessionLocal() as session:
+        service_a = TournamentService(TournamentRepository(session, cache=worker_a))
+        with pytest.raises(HTTPException) as exc_info:
+            await service_a.register_player(
+                tournament.id, PlayerCreate(name="Jane Doe", email="jane@example.com")
+            )
+    assert exc_info.value.detail == "Tournament is full"
+
+
 async def test_get_tournament_players(
     client: AsyncClient, sample_tournament_data, sample_player_data
 ):
@@ -232,3 +410,113 @@ async def test_invalid_player_data(client: AsyncClient, sample_tournament_data):
         f"/api/v1/tournaments/{tournament_id}/register", json=invalid_player
     )
     assert response.status_code == 422
+
+
+def route_budget(endpoint: Any) -> int:
+    budget = get_query_budget(endpoint)
+    assert budget is not None, f"{endpoint.__name__} declares no query budget"
+    return budget
+
+
+# Exact cold-cache counts on the test backends. The declared budgets are for
+# Postgres, which adds a pg_notify per write and leaves room for a Bloom
+# filter false positive, so they are too loose to catch a regression here.
+EXPECTED_QUERIES = {
+    "sql": {"create": 2, "register": 5, "players": 2},
+    "memory": {"create": 0, "register": 0, "players": 0},
+}
+
+
+async def test_query_budgets(
+    client: AsyncClient, backend, sample_tournament_data, sample_player_data
+):
+    """Test each endpoint runs its pinned query count, within its budget."""
+    expected = EXPECTED_QUERIES[backend]
+
+    with assert_max_queries(route_budget(create_tournament)) as stats:
+        tournament_response = await client.post(
+            "/api/v1/tournaments", json=sample_tournament_data
+        )
+    assert stats.count == expected["create"]
+    tournament_id = tournament_response.json()["id"]
+
+    with assert_max_queries(route_budget(register_player)) as stats:
+        await client.post(
+            f"/api/v1/tournaments/{tournament_id}/register", json=sample_player_data
+        )
+    assert stats.count == expected["register"]
+
+    with assert_max_queries(route_budget(get_tournament_players)) as stats:
+        await client.get(f"/api/v1/tournaments/{tournament_id}/players")
+    assert stats.count == expected["players"]
+
+
+@pytest.mark.parametrize("players", [0, 1, 5, 20])
+async def test_tournament_with_players_loads_in_two_queries(
+    setup_database, players: int
+):
+    """Test players are eager-loaded in one query however many there are."""
+    async with TestSessionLocal() as session:
+        repository = TournamentRepository(session, cache=TournamentCache(10))
+        tournament = await repository.create_tournament(
+            TournamentCreate(
+                name="Cup",
+                max_players=max(players, 1),
+                start_at=datetime(2025, 12, 1, 15, 0, tzinfo=timezone.utc),
+            )
+        )
+        for number in range(players):
+            await repository.register_player(
+                tournament.id,
+                PlayerCreate(name=f"Player {number}", email=f"p{number}@example.com"),
+            )
+
+    async with TestSessionLocal() as session:
+        repository = TournamentRepository(session, cache=TournamentCache(10))
+        with assert_max_queries(2):
+            loaded = await repository.get_tournament_with_players(tournament.id)
+            assert loaded is not None
+            emails = [player.email for player in loaded.players]
+    assert len(emails) == players
+
+
+async def test_query_stats_headers(client: AsyncClient, backend):
+    """Test query count and database time are exposed as response headers."""
+    response = await client.get("/api/v1/tournaments/999/players")
+
+    expected_queries = "1" if backend == "sql" else "0"
+    assert response.headers["X-DB-Query-Count"] == expected_queries
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+
+async def test_query_budget_warning(
+    client: AsyncClient, backend, sample_tournament_data, monkeypatch, caplog
+):
+    """Test routes over their budget are logged when warnings are enabled."""
+    monkeypatch.setattr("app.instrumentation.settings.query_budget_warn", True)
+    monkeypatch.setattr(get_tournament_players, QUERY_BUDGET_ATTR, 1)
+    tournament_response = await client.post(
+        "/api/v1/tournaments", json=sample_tournament_data
+    )
+    tournament_id = tournament_response.json()["id"]
+
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        await client.get(f"/api/v1/tournaments/{tournament_id}/players")
+
+    over_budget = "over its budget of 1" in caplog.text
+    assert over_budget == (backend == "sql")
+
+
+async def test_failed_statement_leaves_no_timing_state(setup_database):
+    """Test a statement that raises does not leave state on the pooled connection."""
+    async with test_engine.connect() as conn:
+        sync_connection = conn.sync_connection
+        assert sync_connection is not None
+        info_before = dict(sync_connection.info)
+        with count_queries() as stats:
+            with pytest.raises(OperationalError):
+                await conn.exec_driver_sql("SELECT * FROM missing_table")
+            await conn.exec_driver_sql("SELECT 1")
+
+        assert sync_connection.info == info_before
+        assert stats.count == 1
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+from app import db
+from app.main import app, lifespan
+from app.models.tournament import Tournament
+
+
+def test_import_does_not_create_engine():
+    """Test importing the app neither builds the engine nor loads the driver."""
+    code = (
+        "import sys, app.main, app.db; "
+        "assert app.db.engine is None; "
+        "assert 'asyncpg' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+async def test_lifespan_creates_and_disposes_engine(monkeypatch):
+    """Test the engine and ORM mappers are set up at startup, not on first use."""
+    monkeypatch.setattr("app.main.settings.cache_enabled", False)
+
+    async with lifespan(app):
+        assert db.engine is not None
+        assert Tournament.__mapper__.configured
+
+    assert db.engine is None